@@ -2,6 +2,7 @@ import base64
 import numpy as np
 import time
 import threading
+import queue
 import cv2
 import pydase
 import pydase.units as u
@@ -18,13 +19,76 @@ import pylablib as pll
 from pylablib.devices import DCAM
 from pylablib.devices.DCAM import DCAMTimeoutError
 import gc
+try:
+    from turbojpeg import TurboJPEG, TJPF_GRAY, TJSAMP_GRAY
+except ImportError:
+    TurboJPEG = None
 
 logging.getLogger('pydase').setLevel(logging.WARNING)
+cv2.setUseOptimized(True)
+# Cores this process may run on; leave headroom for the acquisition, display and logging threads
+usable_cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+cv2.setNumThreads(max(1, usable_cores - 2))
 
 class CameraStatus(pyc.ColouredEnum):
     STANDBY = "#FF0000"  # red
     READY = "#00FF00"  # green
 
+class H5LogBuffer:
+    """Collects per-frame log rows in memory and appends them to an HDF5 file in chunk-sized batches."""
+
+    def __init__(self, h5_file, size=1024):
+        self._file = h5_file
+        self._frame_index = np.empty(size, dtype=int)
+        self._photoelectron_count = np.empty(size, dtype=float)
+        self._photoelectron_counts_pp = np.empty(size, dtype=float)
+        self._n = 0
+
+    def append(self, frame_index, photoelectron_count, photoelectron_counts_pp):
+        self._frame_index[self._n] = frame_index
+        self._photoelectron_count[self._n] = photoelectron_count
+        self._photoelectron_counts_pp[self._n] = photoelectron_counts_pp
+        self._n += 1
+        if self._n == len(self._frame_index):
+            self.flush()
+
+    def flush(self):
+        n = self._n
+        if n == 0:
+            return
+        try:
+            for key, buf in (
+                ("frame_index", self._frame_index),
+                ("photoelectron_count", self._photoelectron_count),
+                ("photoelectron_counts_pp", self._photoelectron_counts_pp),
+            ):
+                ds = self._file[key]
+                ds.resize((ds.shape[0] + n,))
+                ds[-n:] = buf[:n]
+        finally:
+            # A failed write drops this batch rather than leaving the buffer full for every later append
+            self._n = 0
+        # Push HDF5's metadata and chunk caches to the file so the new extent survives a crash
+        self._file.flush()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._file.close()
+
+def reduce_rois(img, coords, totals):
+    """Sum img over each (x0, y0, x1, y1) row of coords into totals; coords must already be clipped to img."""
+    for k in range(coords.shape[0]):
+        x0, y0, x1, y1 = coords[k]
+        totals[k] = img[y0:y1, x0:x1].sum(dtype=np.float64) if x1 > x0 and y1 > y0 else 0.0
+
+def reduce_rois_integral(sat, coords, totals):
+    """Like reduce_rois, but reads each sum from a summed-area table of shape (height + 1, width + 1)."""
+    x0, y0, x1, y1 = coords.T
+    valid = (x1 > x0) & (y1 > y0)
+    np.multiply(sat[y1, x1] - sat[y0, x1] - sat[y1, x0] + sat[y0, x0], valid, out=totals)
+
 class ROI(pydase.DataService):
     def __init__(self, parent, name: str, x: int = 0, y: int = 0, width: int = 100, height: int = 100, enabled: bool = True):
         super().__init__()
@@ -47,7 +111,8 @@ class ROI(pydase.DataService):
         self._x = value
         parent = self._parent()
         if parent is not None:
-            parent.save_rois()
+            parent._invalidate_rois()
+            parent._rois_dirty = True
 
     @property
     def y(self):
@@ -58,7 +123,8 @@ class ROI(pydase.DataService):
         self._y = value
         parent = self._parent()
         if parent is not None:
-            parent.save_rois()
+            parent._invalidate_rois()
+            parent._rois_dirty = True
 
     @property
     def width(self):
@@ -69,7 +135,8 @@ class ROI(pydase.DataService):
         self._width = value
         parent = self._parent()
         if parent is not None:
-            parent.save_rois()
+            parent._invalidate_rois()
+            parent._rois_dirty = True
 
     @property
     def height(self):
@@ -80,7 +147,8 @@ class ROI(pydase.DataService):
         self._height = value
         parent = self._parent()
         if parent is not None:
-            parent.save_rois()
+            parent._invalidate_rois()
+            parent._rois_dirty = True
 
     @property
     def enabled(self):
@@ -91,13 +159,15 @@ class ROI(pydase.DataService):
         self._enabled = value
         parent = self._parent()
         if parent is not None:
-            parent.save_rois()
+            parent._invalidate_rois()
+            parent._rois_dirty = True
 
     @frontend
     def delete(self):
         parent = self._parent()
         if parent is not None:
             parent.rois.remove(self)
+            parent._invalidate_rois()
             parent.save_rois()
 
     @property
@@ -126,15 +196,41 @@ class PhotoelectronCamera(pydase.DataService):
         self._frame_count = 0
         self._h5_full = None
         self._h5_rois = {}
+        self._log_q = None
+        self._writer_thread = None
+        self._dropped_log_frames = 0
         self._photoelectrons = None
-        self._display_frame = None
+        self._display_q = None
+        self._display_thread = None
+        self._display_temp = None
         self._display_small = None
+        self._display_small_sub = None
+        self._label_cache = {}
+        self._tj = None
+        if TurboJPEG is not None:
+            try:
+                self._tj = TurboJPEG()
+            except Exception as e:
+                print(f"Error loading libjpeg-turbo: {e}. Using OpenCV JPEG encoder.")
         self._top_crop_percent = 0.0
         self._bottom_crop_percent = 0.0
         self._scan_mode = "UltraQuiet"  # Default; options: "Standard", "UltraQuiet"
         self._status = CameraStatus.STANDBY
+        self._roi_version = 0
+        self._roi_cache_version = -1
+        self._roi_active = []
+        self._roi_names = ()
+        self._subarray = (0, 0, 0, 0)
+        self._roi_coords = np.zeros((0, 4), dtype=np.int32)
+        self._roi_areas = np.zeros(0, dtype=np.int32)
+        self._roi_totals = np.zeros(0, dtype=np.float64)
+        self._roi_means = np.zeros(0, dtype=np.float64)
+        self._rois_dirty = False
+        self._rois_lock = threading.Lock()
         if os.path.exists("rois.json"):
             self.load_rois()
+        self._rois_saver = threading.Thread(target=self._save_rois_loop, daemon=True)
+        self._rois_saver.start()
 
     @property
     def status(self) -> CameraStatus:
@@ -153,7 +249,11 @@ class PhotoelectronCamera(pydase.DataService):
         cv2.putText(img, text, (x, y), font, font_scale, 255, thickness)
         ret, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 50])
         if ret:
-            self.Camera_view.load_from_base64(base64.b64encode(buf.tobytes()))
+            self._show_jpeg(buf)
+
+    def _show_jpeg(self, buf):
+        # Encode straight from the encoder buffer and name the format so pydase need not decode it to sniff it
+        self.Camera_view.load_from_base64(base64.b64encode(memoryview(buf)), "JPEG")
 
     @property
     def exposure_time(self) -> u.Quantity:
@@ -249,23 +349,39 @@ class PhotoelectronCamera(pydase.DataService):
         name = f"ROI{num}"
         new_roi = ROI(parent=self, name=name)
         self.rois.append(new_roi)
+        self._invalidate_rois()
         self.save_rois()
 
     @frontend
     def save_rois(self):
-        rois_data = [
-            {
-                "name": roi.name,
-                "x": roi.x,
-                "y": roi.y,
-                "width": roi.width,
-                "height": roi.height,
-                "enabled": roi.enabled
-            }
-            for roi in self.rois
-        ]
-        with open("rois.json", "w") as f:
-            json.dump(rois_data, f)
+        # Called from the saver thread and from frontend actions; the lock keeps their temp-file writes apart
+        with self._rois_lock:
+            self._rois_dirty = False
+            rois_data = [
+                {
+                    "name": roi.name,
+                    "x": roi.x,
+                    "y": roi.y,
+                    "width": roi.width,
+                    "height": roi.height,
+                    "enabled": roi.enabled
+                }
+                for roi in self.rois
+            ]
+            # Write a temporary file and swap it in, so rois.json is never left half-written
+            with open("rois.json.tmp", "w") as f:
+                json.dump(rois_data, f)
+            os.replace("rois.json.tmp", "rois.json")
+
+    def _save_rois_loop(self):
+        # ROI edits from the frontend only mark the set dirty; persist them at most every 250 ms
+        while True:
+            time.sleep(0.25)
+            if self._rois_dirty:
+                try:
+                    self.save_rois()
+                except Exception as e:
+                    print(f"Error saving ROIs: {e}")
 
     @frontend
     def load_rois(self):
@@ -275,6 +391,7 @@ class PhotoelectronCamera(pydase.DataService):
             self.rois = []
             for data in rois_data:
                 self.rois.append(ROI(parent=self, **data))
+            self._invalidate_rois()
         except Exception as e:
             print(f"Error loading ROIs: {e}")
 
@@ -283,15 +400,21 @@ class PhotoelectronCamera(pydase.DataService):
         if self._running:
             return
         self._running = True
+        self._display_q = queue.Queue(maxsize=1)
+        self._display_thread = threading.Thread(target=self._display_loop, daemon=True)
+        self._display_thread.start()
         self._acquisition_thread = threading.Thread(target=self._acquire_loop, daemon=True)
         self._acquisition_thread.start()
 
     @frontend
     def stop_camera(self):
+        # Logging is owned by start_measurement/stop_measurement, so settings restarts keep a measurement running
+        self._running = False
+        if self._display_thread is not None and self._display_thread.is_alive():
+            self._push_display(None)
+            self._display_thread.join(timeout=5.0)
         self.set_standby_image()
         self._status = CameraStatus.STANDBY
-        self._running = False
-        self._logging = False
         if self._camera is not None:
             try:
                 self._camera.stop_acquisition()
@@ -299,23 +422,192 @@ class PhotoelectronCamera(pydase.DataService):
                 print(f"Error stopping acquisition: {e}")
         if hasattr(self, '_acquisition_thread') and self._acquisition_thread.is_alive():
             self._acquisition_thread.join(timeout=5.0)
+        if self._rois_dirty:
+            try:
+                self.save_rois()
+            except Exception as e:
+                print(f"Error saving ROIs: {e}")
 
     @frontend
     def start_measurement(self):
-        self._logging = True
-        self._h5_full = h5py.File("full_frame.h5", "a")
+        if self._writer_thread is not None:
+            self.stop_measurement()
+        self._h5_full = H5LogBuffer(h5py.File("full_frame.h5", "a"))
         for roi in self.rois:
-            self._h5_rois[roi.name] = h5py.File(f"roi_{roi.name}.h5", "a")
+            self._h5_rois[roi.name] = H5LogBuffer(h5py.File(f"roi_{roi.name}.h5", "a"))
+        self._log_q = queue.Queue(maxsize=4096)
+        self._dropped_log_frames = 0
+        self._writer_thread = threading.Thread(target=self._drain_log, daemon=True)
+        self._writer_thread.start()
+        self._logging = True
 
     @frontend
     def stop_measurement(self):
         self._logging = False
+        if self._writer_thread is not None:
+            self._log_q.put(None)
+            self._writer_thread.join()
+            self._writer_thread = None
+        if self._dropped_log_frames:
+            print(f"Measurement log dropped {self._dropped_log_frames} frames (writer queue full)")
+        h5_files = list(self._h5_rois.values())
         if self._h5_full:
-            self._h5_full.close()
-            self._h5_full = None
-        for h5 in list(self._h5_rois.values()):
-            h5.close()
+            h5_files.insert(0, self._h5_full)
+        self._h5_full = None
         self._h5_rois = {}
+        for h5 in h5_files:
+            try:
+                h5.close()
+            except Exception as e:
+                print(f"Error closing measurement log: {e}")
+
+    def _drain_log(self):
+        # Flush at least once a second, even while frames keep arriving, so a crash of this process loses at most about a second of data
+        next_flush = time.monotonic() + 1.0
+        while True:
+            try:
+                item = self._log_q.get(timeout=max(0.0, next_flush - time.monotonic()))
+            except queue.Empty:
+                item = ()
+            if time.monotonic() >= next_flush:
+                self._flush_logs()
+                next_flush = time.monotonic() + 1.0
+            if item is None:
+                break
+            if not item:
+                continue
+            frame_index, pe, pe_p, roi_names, roi_totals, roi_means = item
+            try:
+                self._h5_full.append(frame_index, pe, pe_p)
+                for name, total, mean in zip(roi_names, roi_totals, roi_means):
+                    h5 = self._h5_rois.get(name)
+                    if h5 is not None:
+                        h5.append(frame_index, total, mean)
+            except Exception as e:
+                print(f"Error writing measurement log: {e}")
+
+    def _flush_logs(self):
+        try:
+            self._h5_full.flush()
+            for h5 in self._h5_rois.values():
+                h5.flush()
+        except Exception as e:
+            print(f"Error flushing measurement log: {e}")
+
+    def _invalidate_rois(self):
+        self._roi_version += 1
+
+    def _build_roi_cache(self):
+        version = self._roi_version
+        hpos, vpos, hsize, vsize = self._subarray
+        active = [roi for roi in self.rois if roi.enabled]
+        coords = np.array([[roi.x, roi.y, roi.x + roi.width, roi.y + roi.height] for roi in active], dtype=np.int32)
+        coords = coords.reshape(len(active), 4)
+        # ROI corners relative to the subarray, clipped to its bounds
+        coords -= np.array((hpos, vpos, hpos, vpos), dtype=np.int32)
+        np.clip(coords, 0, np.array((hsize, vsize, hsize, vsize), dtype=np.int32), out=coords)
+        self._roi_active = active
+        self._roi_names = tuple(roi.name for roi in active)
+        self._roi_coords = coords
+        self._roi_areas = np.maximum(coords[:, 2] - coords[:, 0], 0) * np.maximum(coords[:, 3] - coords[:, 1], 0)
+        self._roi_totals = np.zeros(len(active), dtype=np.float64)
+        self._roi_means = np.zeros(len(active), dtype=np.float64)
+        self._roi_cache_version = version
+
+    def _push_display(self, item):
+        # Keep only the newest item; a stale frame waiting for the encoder is simply replaced
+        try:
+            self._display_q.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self._display_q.put_nowait(item)
+        except queue.Full:
+            pass
+
+    def _display_loop(self):
+        while self._running:
+            try:
+                item = self._display_q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+            try:
+                self._render_display(*item)
+            except Exception as e:
+                print(f"Display error: {e}")
+
+    def _render_display(self, image, offset, subarray_on, hpos, vpos, full_width, full_height):
+        vsize, hsize = image.shape
+        if self._display_temp is None or self._display_temp.shape != image.shape:
+            self._display_temp = np.empty((vsize, hsize), dtype=np.uint8)
+        new_height, new_width = int(full_height * 0.25), int(full_width * 0.25)
+        if self._display_small is None or self._display_small.shape != (new_height, new_width):
+            self._display_small = np.empty((new_height, new_width), dtype=np.uint8)
+        sx = new_width / full_width
+        sy = new_height / full_height
+        # Where the subarray lands on the downscaled full-sensor canvas
+        top, bottom = int(vpos * sy), min(int((vpos + vsize) * sy), new_height)
+        left, right = int(hpos * sx), min(int((hpos + hsize) * sx), new_width)
+        if self._display_small_sub is None or self._display_small_sub.shape != (bottom - top, right - left):
+            self._display_small_sub = np.empty((bottom - top, right - left), dtype=np.uint8)
+        temp_display = self._display_temp
+        if image.dtype == np.uint16:
+            # Saturating uint16 subtract clamps below-offset counts to 0; the display is proportional to photoelectrons
+            cv2.subtract(image, float(offset), dst=image)
+        max_val = image.max()
+        if max_val > 0:
+            # Scale and saturate to 8 bits in one pass
+            cv2.convertScaleAbs(image, dst=temp_display, alpha=255.0 / float(max_val))
+        else:
+            temp_display.fill(0)
+        # Only the subarray is downscaled; the cropped-away rows stay black on the small canvas
+        self._display_small.fill(0)
+        if bottom > top and right > left:
+            cv2.resize(temp_display, (right - left, bottom - top), dst=self._display_small_sub, interpolation=cv2.INTER_AREA)
+            self._display_small[top:bottom, left:right] = self._display_small_sub
+        # Overlays are drawn after downscaling, in scaled coordinates, so far fewer pixels are rasterized
+        if subarray_on:
+            cv2.line(self._display_small, (0, top), (new_width - 1, top), 255, 1)
+            cv2.line(self._display_small, (0, bottom), (new_width - 1, bottom), 255, 1)
+        for i, roi in enumerate(self.rois):
+            if roi.enabled:
+                x0, y0 = int(roi.x * sx), int(roi.y * sy)
+                x1, y1 = int((roi.x + roi.width) * sx), int((roi.y + roi.height) * sy)
+                cv2.rectangle(self._display_small, (x0, y0), (x1, y1), 255, 1)
+                self._blit_label(self._display_small, f"{roi.name} ({i+1})", x0, y0 - 3)
+        buf = self._encode_jpeg(self._display_small)
+        if buf is not None:
+            self._show_jpeg(buf)
+        else:
+            print("Failed to encode frame.")
+
+    def _encode_jpeg(self, img):
+        if self._tj is not None:
+            # libjpeg-turbo with grayscale subsampling skips chroma work entirely
+            return self._tj.encode(img, quality=50, pixel_format=TJPF_GRAY, jpeg_subsample=TJSAMP_GRAY)
+        ret, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 50, cv2.IMWRITE_JPEG_OPTIMIZE, 0, cv2.IMWRITE_JPEG_PROGRESSIVE, 0])
+        return buf if ret else None
+
+    def _blit_label(self, dst, text, x, y):
+        # Labels are rasterized once and cached; later ticks only merge the cached tile into dst
+        cached = self._label_cache.get(text)
+        if cached is None:
+            if len(self._label_cache) > 64:
+                self._label_cache.clear()
+            (w, h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.4, 1)
+            patch = np.zeros((h + baseline, w), dtype=np.uint8)
+            cv2.putText(patch, text, (0, h), cv2.FONT_HERSHEY_SIMPLEX, 0.4, 255, 1)
+            cached = self._label_cache[text] = (patch, h)
+        patch, h = cached
+        # (x, y) is the text baseline origin, as for cv2.putText; clip the tile to dst
+        top, left = y - h, x
+        y0, x0 = max(top, 0), max(left, 0)
+        y1, x1 = min(top + patch.shape[0], dst.shape[0]), min(left + patch.shape[1], dst.shape[1])
+        if y1 > y0 and x1 > x0:
+            region = dst[y0:y1, x0:x1]
+            np.maximum(region, patch[y0 - top : y1 - top, x0 - left : x1 - left], out=region)
 
     def _set_subarray(self):
         full_width, full_height = self._camera.get_detector_size()
@@ -339,6 +631,8 @@ class PhotoelectronCamera(pydase.DataService):
             hpos = 0
             hsize = full_width
         subarray_on = vsize < full_height
+        self._subarray = (hpos, vpos, hsize, vsize)
+        self._invalidate_rois()
         return subarray_on, hpos, hsize, vpos, vsize
 
     def _acquire_loop(self):
@@ -372,90 +666,63 @@ class PhotoelectronCamera(pydase.DataService):
             full_width, full_height = self._camera.get_detector_size()
             prev_time = time.time()
             last_display_time = 0.0
+            frame_base = self._frame_count  # Keeps indices increasing across camera restarts
             self._photoelectrons = np.empty((vsize, hsize), dtype=np.float32)
-            temp_display = np.empty((vsize, hsize), dtype=np.uint8)
-            self._display_frame = np.empty((full_height, full_width), dtype=np.uint8)
-            new_height = int(full_height * 0.25)
-            new_width = int(full_width * 0.25)
-            self._display_small = np.empty((new_height, new_width), dtype=np.uint8)
+            sat = np.empty((vsize + 1, hsize + 1), dtype=np.float64)
+            gc.freeze()  # Move long-lived objects out of the collector's generations
             while self._running:
                 try:
                     got_frame = self._camera.wait_for_frame(timeout=0.1, error_on_stopped=False)
                     if not got_frame:
                         continue
-                    frame = self._camera.read_newest_image()
-                    if frame is None:
+                    # Drain every buffered frame so none are lost from the log; the newest one feeds the display
+                    frames, infos = self._camera.read_multiple_images(missing_frame="skip", return_info=True)
+                    if not frames:
                         continue
                     current_time = time.time()
-                    self._fps = 1 / (current_time - prev_time) if self._frame_count > 0 else 0.0
+                    self._fps = len(frames) / (current_time - prev_time) if self._frame_count > 0 else 0.0
                     prev_time = current_time
-                    self._photoelectrons[:] = frame.astype(np.float32)
-                    self._photoelectrons -= offset
-                    self._photoelectrons *= coeff
-                    np.maximum(self._photoelectrons, 0, out=self._photoelectrons)
-                    self._p_e = float(np.sum(self._photoelectrons))
-                    self._p_e_p = float(np.mean(self._photoelectrons))
-                    for roi in self.rois:
-                        if roi.enabled:
-                            roi_x, roi_y, roi_w, roi_h = roi.x, roi.y, roi.width, roi.height
-                            rel_x = roi_x - hpos
-                            rel_y = roi_y - vpos
-                            start_x = max(0, rel_x)
-                            end_x = min(hsize, rel_x + roi_w)
-                            start_y = max(0, rel_y)
-                            end_y = min(vsize, rel_y + roi_h)
-                            if end_x > start_x and end_y > start_y:
-                                roi_slice = self._photoelectrons[start_y:end_y, start_x:end_x]
-                                roi._total_pe = float(np.sum(roi_slice))
-                                area = (end_x - start_x) * (end_y - start_y)
-                                roi._mean_pe_per_pixel = roi._total_pe / area if area > 0 else 0.0
-                            else:
-                                roi._total_pe = 0.0
-                                roi._mean_pe_per_pixel = 0.0
-                    self._frame_count += 1
-                    if self._logging:
-                        for key in ["frame_index", "photoelectron_count", "photoelectron_counts_pp"]:
-                            ds = self._h5_full[key]
-                            ds.resize((ds.shape[0] + 1,))
-                        self._h5_full["frame_index"][-1] = self._frame_count
-                        self._h5_full["photoelectron_count"][-1] = self._p_e
-                        self._h5_full["photoelectron_counts_pp"][-1] = self._p_e_p
-                        for roi in self.rois:
-                            if roi.enabled:
-                                h5 = self._h5_rois[roi.name]
-                                for key in ["frame_index", "photoelectron_count", "photoelectron_counts_pp"]:
-                                    ds = h5[key]
-                                    ds.resize((ds.shape[0] + 1,))
-                                h5["frame_index"][-1] = self._frame_count
-                                h5["photoelectron_count"][-1] = roi._total_pe
-                                h5["photoelectron_counts_pp"][-1] = roi._mean_pe_per_pixel
-                    if current_time - last_display_time >= 1.0:
-                        max_val = self._photoelectrons.max()
-                        if max_val > 0:
-                            np.divide(self._photoelectrons, max_val, out=self._photoelectrons)
-                            np.multiply(self._photoelectrons, 255, out=self._photoelectrons)
-                            temp_display[:] = self._photoelectrons.astype(np.uint8)
+                    if self._roi_cache_version != self._roi_version:
+                        self._build_roi_cache()
+                    for frame, info in zip(frames, infos):
+                        if frame.dtype == np.uint16:
+                            # In-place ufuncs on the preallocated buffer; no per-frame temporaries
+                            np.copyto(self._photoelectrons, frame, casting='unsafe')
+                            self._photoelectrons -= offset
+                            self._photoelectrons *= coeff
+                            np.maximum(self._photoelectrons, 0, out=self._photoelectrons)
                         else:
-                            temp_display.fill(0)
-                        self._display_frame.fill(0)
-                        self._display_frame[vpos : vpos + vsize, hpos : hpos + hsize] = temp_display
-                        if subarray_on:
-                            cv2.line(self._display_frame, (0, vpos), (full_width - 1, vpos), 255, 2)
-                            cv2.line(self._display_frame, (0, vpos + vsize), (full_width - 1, vpos + vsize), 255, 2)
-                        for i, roi in enumerate(self.rois):
-                            if roi.enabled:
-                                cv2.rectangle(self._display_frame, (roi.x, roi.y), (roi.x + roi.width, roi.y + roi.height), 255, 2)
-                                cv2.putText(self._display_frame, f"{roi.name} ({i+1})", (roi.x, roi.y - 10), cv2.FONT_HERSHEY_SIMPLEX, 1.75, 255, 2)
-                        cv2.resize(self._display_frame, (new_width, new_height), dst=self._display_small, interpolation=cv2.INTER_AREA)
-                        ret, buf = cv2.imencode(".jpg", self._display_small, [cv2.IMWRITE_JPEG_QUALITY, 50])
-                        if ret:
-                            self.Camera_view.load_from_base64(base64.b64encode(buf.tobytes()))
+                            cv2.subtract(frame, float(offset), dst=self._photoelectrons, dtype=cv2.CV_32F)
+                            cv2.multiply(self._photoelectrons, float(coeff), dst=self._photoelectrons)
+                            cv2.threshold(self._photoelectrons, 0, 0, cv2.THRESH_TOZERO, dst=self._photoelectrons)
+                        if len(self._roi_active) >= 4:
+                            # One shared pass makes every ROI sum O(1), which beats slicing once ROIs multiply or overlap
+                            cv2.integral(self._photoelectrons, sat, cv2.CV_64F)
+                            reduce_rois_integral(sat, self._roi_coords, self._roi_totals)
+                            pe = float(sat[-1, -1])  # The table's last corner is already the full-frame sum
                         else:
-                            print("Failed to encode frame.")
+                            reduce_rois(self._photoelectrons, self._roi_coords, self._roi_totals)
+                            pe = float(self._photoelectrons.sum(dtype=np.float64))  # Same precision as the summed-area table
+                        pe_p = pe / self._photoelectrons.size
+                        np.divide(self._roi_totals, self._roi_areas, out=self._roi_means, where=self._roi_areas > 0)
+                        # Camera frame index, so frames lost by the driver show up as gaps in the log
+                        self._frame_count = frame_base + info.frame_index + 1
+                        if self._logging:
+                            try:
+                                self._log_q.put_nowait((self._frame_count, pe, pe_p, self._roi_names, self._roi_totals.copy(), self._roi_means.copy()))
+                            except queue.Full:
+                                self._dropped_log_frames += 1
+                    # Publish only the newest frame's values; every assignment here notifies the pydase frontend
+                    self._p_e = pe
+                    self._p_e_p = pe_p
+                    for roi, total, mean in zip(self._roi_active, self._roi_totals, self._roi_means):
+                        roi._total_pe = float(total)
+                        roi._mean_pe_per_pixel = float(mean)
+                    if current_time - last_display_time >= 1.0:
+                        # Raw 16-bit frames are half the size of the photoelectron buffer
+                        image = frame.copy() if frame.dtype == np.uint16 else self._photoelectrons.copy()
+                        self._push_display((image, offset, subarray_on, hpos, vpos, full_width, full_height))
                         last_display_time = current_time
-                    gc.collect()
-                    if self._frame_count % 10 == 0:
-                        gc.collect()
                 except DCAMTimeoutError:
                     continue
                 except Exception as e:
@@ -469,6 +736,7 @@ class PhotoelectronCamera(pydase.DataService):
                     print(f"Error closing camera: {e}")
             self._camera = None
             self._status = CameraStatus.STANDBY
+            gc.unfreeze()
 
 if __name__ == "__main__":
     service_instance = PhotoelectronCamera(frames_per_chunk=20)
@@ -477,3 +745,4 @@ if __name__ == "__main__":
         server.run()  # Starts web server; access at http://localhost:8000
     finally:
         service_instance.stop_camera()
+        service_instance.stop_measurement()  # Flushes buffered log rows before the daemon writer dies